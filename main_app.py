@@ -8,14 +8,12 @@ import os
 import secrets
 import logging
 from datetime import timedelta, datetime
-import re
 
 from flask_wtf.csrf import CSRFProtect
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_talisman import Talisman
 from flask_compress import Compress
-import bleach
 
 from modules.monthly_statements.monthly_statements import monthly_statements_bp
 from modules.invoices.invoices import invoices_bp
@@ -42,7 +40,12 @@ app.config.update({
     'SESSION_COOKIE_SECURE': os.environ.get('FLASK_ENV') == 'production',
     'SESSION_COOKIE_HTTPONLY': True,
     'SESSION_COOKIE_SAMESITE': 'Lax',
-    'PERMANENT_SESSION_LIFETIME': timedelta(hours=2)
+    'PERMANENT_SESSION_LIFETIME': timedelta(hours=2),
+    # Hand static result downloads to the front-end server (X-Sendfile /
+    # X-Accel-Redirect) when one is configured; without it Werkzeug still
+    # uses wsgi.file_wrapper, which dispatches to sendfile(2) under
+    # gunicorn, so file bytes never pass through Python either way
+    'USE_X_SENDFILE': os.environ.get('USE_X_SENDFILE') == '1'
 })
 
 
@@ -96,22 +99,6 @@ logging.basicConfig(
 )
 
 
-###############################################################################
-# INPUT VALIDATION UTILITIES
-# O(1) session validation and O(n) input sanitization
-###############################################################################
-
-def validate_session_id(session_id):
-    """Validate session ID format - O(1) complexity"""
-    if not session_id or not isinstance(session_id, str) or len(session_id) > 50:
-        return False
-    return bool(re.match(r'^session_\d{8}_\d{6}$', session_id))
-
-def sanitize_input(text):
-    """Sanitize user input - O(n) complexity where n is text length"""
-    return bleach.clean(str(text or ""), tags=[], attributes={}, strip=True)
-
-
 ###############################################################################
 # ERROR HANDLERS
 # Secure error responses that don't leak information
@@ -1,8 +1,15 @@
 from flask import Blueprint, request, redirect, url_for, render_template, send_from_directory, jsonify
-from pypdf import PdfReader, PdfWriter  # pypdf instead of PyMuPDF
 import re
 import os
 import logging
+
+# Try PyMuPDF first (native C-level page scanning), fall back to pypdf
+try:
+    import fitz  # PyMuPDF
+    PDF_LIBRARY = 'pymupdf'
+except ImportError:
+    from pypdf import PdfReader, PdfWriter
+    PDF_LIBRARY = 'pypdf'
 from werkzeug.utils import secure_filename
 import zipfile
 import shutil
@@ -23,14 +30,14 @@ UPLOAD_FOLDER = os.path.abspath('uploads')
 RESULT_FOLDER = os.path.abspath('separate_results')
 ALLOWED_EXTENSIONS = {'pdf'}
 
-# Setting up logging
-logging.basicConfig(level=logging.INFO)
+# Module logger; configuration happens once at the app entrypoint
+logger = logging.getLogger(__name__)
 
 @invoices_bp.route('/clear_results', methods=['POST'])
 def clear_results():
     try:
         result_folder = os.path.abspath('separate_results')
-        logging.info(f"Attempting to clear contents of {result_folder}")
+        logger.info("Attempting to clear contents of %s", result_folder)
         
         # Security check: ensure folder exists and is safe to clear
         if not os.path.exists(result_folder):
@@ -46,13 +53,13 @@ def clear_results():
                     continue
                 
                 if os.path.isfile(file_path):
-                    logging.info(f"Deleting file: {file_path}")
+                    logger.info("Deleting file: %s", file_path)
                     os.remove(file_path)
                 elif os.path.isdir(file_path):
-                    logging.info(f"Deleting directory and its contents: {file_path}")
+                    logger.info("Deleting directory and its contents: %s", file_path)
                     shutil.rmtree(file_path)
         
-        logging.info("Finished clearing results folder.")
+        logger.info("Finished clearing results folder.")
         return jsonify({'status': 'success'})
     
     except Exception as e:
@@ -62,47 +69,86 @@ def clear_results():
 def allowed_file(filename, allowed_extensions):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
+INVOICE_PATTERN = re.compile(r'\b[P|R]\d{6,8}\b')  # Matches 6, 7, or 8 digits
+
 def extract_invoice_numbers_and_split(input_pdf, output_folder):
-    reader = PdfReader(input_pdf)
-    pattern = r'\b[P|R]\d{6,8}\b'  # Modified regex to match 6, 7, or 8 digits
-    invoices_found = False
-    
+    try:
+        if PDF_LIBRARY == 'pymupdf':
+            return _extract_and_split_pymupdf(input_pdf, output_folder)
+        return _extract_and_split_pypdf(input_pdf, output_folder)
+    except Exception as e:
+        logger.error("Error processing PDF: %s", e)
+        return False
+
+def _extract_and_split_pymupdf(input_pdf, output_folder):
+    doc = fitz.open(input_pdf)
     try:
         pages_by_invoice = {}
-        
-        # Extract text from each page and find invoice numbers
-        for page_num, page in enumerate(reader.pages):
+
+        for page_num in range(len(doc)):
             try:
-                text = page.extract_text()
-                invoice_numbers = re.findall(pattern, text)
-                if invoice_numbers:
-                    invoices_found = True
-                for invoice_number in invoice_numbers:
-                    if invoice_number not in pages_by_invoice:
-                        pages_by_invoice[invoice_number] = []
-                    pages_by_invoice[invoice_number].append(page_num)
+                page = doc.load_page(page_num)
+                # Cheap native pre-filter: invoice numbers start with P or R, so
+                # pages where MuPDF's C-level search finds neither glyph can skip
+                # text decoding and the regex entirely
+                if not page.search_for("P") and not page.search_for("R"):
+                    continue
+                text = page.get_text("text", flags=0)
             except Exception as e:
-                logging.warning(f"Could not extract text from page {page_num}: {e}")
+                logger.warning("Could not extract text from page %s: %s", page_num, e)
                 continue
 
-        if not invoices_found:
+            for invoice_number in INVOICE_PATTERN.findall(text):
+                pages_by_invoice.setdefault(invoice_number, []).append(page_num)
+
+        if not pages_by_invoice:
             return False  # No invoices found
 
-        # Create separate PDFs for each invoice
+        # Create separate PDFs for each invoice. Cloning the source and using
+        # select() lets MuPDF rebuild the cross-reference in one shot, and
+        # garbage-collecting unreferenced objects keeps the outputs compact
+        # (smaller zip, faster download)
         for invoice_number, page_nums in pages_by_invoice.items():
-            writer = PdfWriter()
-            for page_num in page_nums:
-                if page_num < len(reader.pages):
-                    writer.add_page(reader.pages[page_num])
-            
+            output_pdf = fitz.open(input_pdf)
+            output_pdf.select(page_nums)
+
             output_filename = os.path.join(output_folder, f"{invoice_number}.pdf")
-            with open(output_filename, 'wb') as output_file:
-                writer.write(output_file)
-                
-    except Exception as e:
-        logging.error(f"Error processing PDF: {e}")
-        return False
-        
+            output_pdf.save(output_filename, garbage=3, deflate=True, clean=True, pretty=False)
+            output_pdf.close()
+    finally:
+        doc.close()
+
+    return True
+
+def _extract_and_split_pypdf(input_pdf, output_folder):
+    reader = PdfReader(input_pdf)
+    pages_by_invoice = {}
+
+    # Extract text from each page and find invoice numbers
+    for page_num, page in enumerate(reader.pages):
+        try:
+            text = page.extract_text()
+        except Exception as e:
+            logger.warning("Could not extract text from page %s: %s", page_num, e)
+            continue
+
+        for invoice_number in INVOICE_PATTERN.findall(text):
+            pages_by_invoice.setdefault(invoice_number, []).append(page_num)
+
+    if not pages_by_invoice:
+        return False  # No invoices found
+
+    # Create separate PDFs for each invoice
+    for invoice_number, page_nums in pages_by_invoice.items():
+        writer = PdfWriter()
+        for page_num in page_nums:
+            if page_num < len(reader.pages):
+                writer.add_page(reader.pages[page_num])
+
+        output_filename = os.path.join(output_folder, f"{invoice_number}.pdf")
+        with open(output_filename, 'wb') as output_file:
+            writer.write(output_file)
+
     return True
 
 @invoices_bp.route('/')
@@ -112,7 +158,7 @@ def upload_file():
 @invoices_bp.route('/process', methods=['POST'])
 def process_file():
     try:
-        logging.info("Received a request to process file.")
+        logger.info("Received a request to process file.")
         
         # Check if file is present
         if 'file' not in request.files:
@@ -140,49 +186,46 @@ def process_file():
             return secure_error_response(pdf_validation['error'], 422)
         
         if pdf_file and pdf_file.filename.lower().endswith('.pdf'):
-            logging.info(f"File {pdf_file.filename} is allowed and will be processed.")
-            
-            if not os.path.exists(UPLOAD_FOLDER):
-                os.makedirs(UPLOAD_FOLDER)
-                logging.info(f"Created upload folder: {UPLOAD_FOLDER}")
-            
+            logger.info("File %s is allowed and will be processed.", pdf_file.filename)
+
+            os.makedirs(UPLOAD_FOLDER, mode=0o700, exist_ok=True)
+
             filename = secure_filename(pdf_file.filename)
             file_path = os.path.join(UPLOAD_FOLDER, filename)
-            pdf_file.save(file_path)
-            
-            # Set restrictive permissions
-            os.chmod(file_path, 0o600)
-            logging.info(f"Saved file to {file_path}")
-        
-            if not os.path.exists(RESULT_FOLDER):
-                os.makedirs(RESULT_FOLDER)
-                logging.info(f"Created result folder: {RESULT_FOLDER}")
+
+            # Create with restrictive permissions atomically (no post-save chmod window)
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(pdf_file.stream, out, length=1024 * 1024)
+            logger.info("Saved file to %s", file_path)
+
+            os.makedirs(RESULT_FOLDER, mode=0o700, exist_ok=True)
             
             result_folder = os.path.join(RESULT_FOLDER, filename.rsplit('.', 1)[0], 'separateInvoices')
             os.makedirs(result_folder, exist_ok=True)
-            logging.info(f"Created result subfolder: {result_folder}")
+            logger.info("Created result subfolder: %s", result_folder)
             
             invoices_found = extract_invoice_numbers_and_split(file_path, result_folder)
-            logging.info(f"Invoices found: {invoices_found}")
+            logger.info("Invoices found: %s", invoices_found)
             
             if not invoices_found:
                 message = 'The PDF you chose does not contain any invoice'
-                logging.info(message)
+                logger.info(message)
                 return jsonify({'error': message}), 400
             else:
                 zip_filename = f"{filename.rsplit('.', 1)[0]}.zip"
                 zip_path = os.path.join(RESULT_FOLDER, zip_filename)
                 
                 if not os.path.isfile(zip_path):
-                    logging.info(f"Creating zip file: {zip_filename}")
+                    logger.info("Creating zip file: %s", zip_filename)
                     with zipfile.ZipFile(zip_path, 'w') as zipf:
                         for root, dirs, files in os.walk(result_folder):
                             for file in files:
                                 zipf.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), result_folder))
-                    logging.info(f"Created zip file at {zip_path}")
+                    logger.info("Created zip file at %s", zip_path)
                 
                 message = 'Invoices separated successfully. Find PDF files in your downloads.'
-                logging.info(message)
+                logger.info(message)
                 return jsonify({
                     'success': True,
                     'message': message,
@@ -190,7 +233,7 @@ def process_file():
                     'download_url': url_for('invoices.download_file', filename=zip_filename)
                 })
         else:
-            logging.info("File is not allowed or not a PDF.")
+            logger.info("File is not allowed or not a PDF.")
             return jsonify({'error': 'The file is not a valid PDF or is not allowed.'}), 400
     
     except Exception as e:
@@ -222,7 +265,10 @@ def download_file(filename):
         return secure_error_response('Access denied', 403)
     
     if os.path.exists(zip_path):
-        return send_from_directory(RESULT_FOLDER, secure_name, as_attachment=True)
+        # conditional=True serves ranged/If-Modified-Since requests so
+        # interrupted downloads resume instead of restarting from byte 0
+        return send_from_directory(RESULT_FOLDER, secure_name, as_attachment=True,
+                                   conditional=True)
     else:
         log_security_event('file_not_found', {'filename': secure_name})
         return secure_error_response('File not found', 404)
@@ -237,9 +283,9 @@ def delete_separate_results():
         
         if os.path.exists(RESULT_FOLDER):
             shutil.rmtree(RESULT_FOLDER)
-            logging.info(f"Deleted contents of {RESULT_FOLDER}")
+            logger.info("Deleted contents of %s", RESULT_FOLDER)
             os.makedirs(RESULT_FOLDER)
-            logging.info(f"Recreated empty result folder: {RESULT_FOLDER}")
+            logger.info("Recreated empty result folder: %s", RESULT_FOLDER)
         
         return jsonify({'status': 'success'})
     
@@ -1,17 +1,29 @@
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify, send_from_directory
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify, send_from_directory, Response
+import io
 import os
+import secrets
 import shutil
+import threading
+import time
 import asyncio
+from collections import Counter, deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 import json
 from werkzeug.utils import secure_filename
-import tempfile
+
+# orjson serializes 5-10x faster than stdlib json; fall back gracefully
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import zipfile
 
 # Import existing processor from same directory
-from .statement_processor import StatementProcessor
+from .statement_processor import StatementProcessor, Statement, split_statements_pdf
 
 # Import security utilities
 from security import (
@@ -30,9 +42,91 @@ monthly_statements_bp = Blueprint('monthly_statements', __name__, template_folde
 UPLOAD_FOLDER = os.path.abspath('uploads')
 RESULT_FOLDER = os.path.abspath('results')
 
-# Ensure directories exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(RESULT_FOLDER, exist_ok=True)
+# Output filenames produced by StatementProcessor.create_split_pdfs
+_PDF_NAMES = {
+    "DNM": "DNM.pdf",
+    "Foreign": "Foreign.pdf",
+    "Natio Single": "natioSingle.pdf",
+    "Natio Multi": "natioMulti.pdf"
+}
+
+# Ensure directories exist with restrictive permissions (single syscall when present)
+os.makedirs(UPLOAD_FOLDER, mode=0o700, exist_ok=True)
+os.makedirs(RESULT_FOLDER, mode=0o700, exist_ok=True)
+
+# CPU-heavy extraction and splitting run in worker processes so concurrent
+# uploads scale with cores instead of serializing on the GIL. The pool is
+# created lazily to keep import (and any forked worker re-import) cheap.
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _process_pool
+
+def _extract_worker(pdf_path: str, excel_path: str) -> List[Statement]:
+    """Process-pool worker: build a processor and extract statements."""
+    return StatementProcessor(pdf_path, excel_path).extract_statements()
+
+def _log_timestamp() -> str:
+    """Build HH:MM:SS by integer formatting; strftime re-parses its format
+    string and consults locale data on every call."""
+    lt = time.localtime()
+    return f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}"
+
+def _save_upload(file_storage, path: str) -> None:
+    """Save an upload with 0o600 permissions set atomically at create time."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # Unbuffered: copyfileobj already moves 1MB chunks, so an intermediate
+    # BufferedWriter would only add a memcpy per chunk
+    with os.fdopen(fd, 'wb', buffering=0) as out:
+        shutil.copyfileobj(file_storage.stream, out, length=1024 * 1024)
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write target for ZipFile that hands finished chunks to a generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        chunks, self._chunks = self._chunks, []
+        return b''.join(chunks)
+
+def _stream_zip(entries):
+    """Yield zip archive bytes for (archive_name, file_path) pairs.
+
+    Streams straight into the HTTP response, so no temp archive is staged
+    on disk and the first byte reaches the client immediately.
+    """
+    buffer = _ZipStreamBuffer()
+    # PDFs carry their own deflated streams, so ZIP_DEFLATED burns CPU for
+    # near-zero size reduction; store entries verbatim and allow zip64 so
+    # very large result sets still produce a valid archive
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED, allowZip64=True) as zip_file:
+        for archive_name, file_path in entries:
+            with open(file_path, 'rb') as src, zip_file.open(archive_name, 'w') as dst:
+                while True:
+                    chunk = src.read(65536)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+    data = buffer.drain()
+    if data:
+        yield data
 
 class WebStatementProcessor:
     """Web interface wrapper for StatementProcessor"""
@@ -40,57 +134,106 @@ class WebStatementProcessor:
     def __init__(self, pdf_path: str, excel_path: str, session_id: str):
         self.processor = StatementProcessor(pdf_path, excel_path)
         self.session_id = session_id
-        self.statements: List[Dict[str, Any]] = []
+        self.statements: List[Statement] = []
         self.current_question_index = 0
-        self.questions_needed: List[Dict[str, Any]] = []
+        self.questions_needed: List[Statement] = []
         self.user_responses: List[str] = []
-        self.question_history: List[int] = []
+        self.question_history: deque = deque()
         
         # Background processing status
         self._processing_status = 'pending'
         self._start_time = None
-        self._processing_logs = []
+        self._processing_logs = deque(maxlen=1000)
+        self._log_total = 0  # Monotonic count of all entries ever appended
         self._error_message = None
+
+        # Long-poll support: status requests park on this condition until a
+        # background thread advances the state sequence
+        self._state_cv = threading.Condition()
+        self._state_seq = 0
+
+        # Serializes create_results so racy handlers can't run it twice
+        self._results_lock = threading.Lock()
+
+    def ensure_results(self) -> Dict[str, Any]:
+        """Create results exactly once and memoize them across handlers.
+
+        Both answer_question's background thread and results_page can race
+        to build results; without the lock that doubled the JSON write and
+        spawned duplicate PDF-creation threads.
+        """
+        with self._results_lock:
+            if not hasattr(self, '_results'):
+                self._results = self.create_results()
+            return self._results
+
+    def _append_log(self, entry: str) -> None:
+        """Append a log entry and advance the monotonic log cursor.
+
+        Entries are stored pre-encoded as JSON bytes so the frequently
+        polled logs endpoint never re-escapes or re-encodes them.
+        """
+        self._processing_logs.append(json.dumps(entry).encode('ascii'))
+        self._log_total += 1
+
+    def notify_state_change(self) -> None:
+        """Wake any long-polling status requests after a state transition."""
+        with self._state_cv:
+            self._state_seq += 1
+            self._state_cv.notify_all()
+
+    def wait_for_state_change(self, last_seq: int, timeout: float = 25.0) -> None:
+        """Block until the state sequence passes last_seq or timeout lapses."""
+        with self._state_cv:
+            self._state_cv.wait_for(lambda: self._state_seq > last_seq, timeout=timeout)
     
-    def extract_statements(self) -> List[Dict[str, Any]]:
+    def extract_statements(self) -> List[Statement]:
         """Extract statements from PDF"""
         self.statements = self.processor.extract_statements()
+        self.questions_needed = [stmt for stmt in self.statements if stmt.ask_question]
         return self.statements
     
     def start_background_extraction(self):
         """Start background statement extraction to prevent HTTP timeouts"""
-        import threading
         import logging
         from datetime import datetime
-        
+
         logger = logging.getLogger(__name__)
         
         def log_message(msg):
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] {msg}"
+            log_entry = f"[{_log_timestamp()}] {msg}"
             logger.info(f"[{self.session_id}] {msg}")
-            self._processing_logs.append(log_entry)
+            self._append_log(log_entry)
         
         def extract_in_background():
             try:
                 log_message("Background extraction thread started")
                 self._processing_status = 'processing'
                 self._start_time = datetime.now()
+                self.notify_state_change()
                 
                 log_message("Starting PDF text extraction...")
-                self.statements = self.processor.extract_statements()
+                # Run the parse in a worker process; this thread just waits,
+                # so other uploads are not GIL-bound behind the extraction
+                self.statements = _get_process_pool().submit(
+                    _extract_worker,
+                    str(self.processor.pdf_path),
+                    str(self.processor.excel_path)
+                ).result()
                 log_message(f"Extracted {len(self.statements)} statements successfully")
                 
                 log_message("Analyzing statements for manual review...")
-                self.questions_needed = [stmt for stmt in self.statements if stmt.get('ask_question', False)]
+                self.questions_needed = [stmt for stmt in self.statements if stmt.ask_question]
                 log_message(f"Found {len(self.questions_needed)} statements requiring manual review")
                 
                 self._processing_status = 'completed'
+                self.notify_state_change()
                 log_message("Statement extraction completed successfully")
-                
+
             except Exception as e:
                 self._processing_status = 'error'
                 self._error_message = str(e)
+                self.notify_state_change()
                 log_message(f"ERROR: Statement extraction failed - {str(e)}")
                 logger.error(f"[{self.session_id}] Background extraction failed", exc_info=True)
         
@@ -103,9 +246,8 @@ class WebStatementProcessor:
         
         log_message("Background thread started, returning control to web interface")
     
-    def get_questions(self) -> List[Dict[str, Any]]:
-        """Get questions that need manual review"""
-        self.questions_needed = [stmt for stmt in self.statements if stmt.get('ask_question', False)]
+    def get_questions(self) -> List[Statement]:
+        """Get questions that need manual review (filtered once at extraction)"""
         return self.questions_needed
     
     def process_question_response(self, response: str) -> Dict[str, Any]:
@@ -117,16 +259,17 @@ class WebStatementProcessor:
         
         if response == 'y':
             self.question_history.append(self.current_question_index)
-            statement['destination'] = 'DNM'
-            statement['user_answered'] = 'yes'
+            statement.destination = 'DNM'
+            statement.user_answered = 'yes'
             self.current_question_index += 1
         elif response == 'n':
             self.question_history.append(self.current_question_index)
-            statement['user_answered'] = 'no'
+            statement.user_answered = 'no'
             self.current_question_index += 1
         elif response == 's':
-            for i in range(self.current_question_index, len(self.questions_needed)):
-                self.questions_needed[i]['user_answered'] = 'skip'
+            # Iterate the slice directly (C-level) instead of indexing per element
+            for stmt in self.questions_needed[self.current_question_index:]:
+                stmt.user_answered = 'skip'
             self.current_question_index = len(self.questions_needed)
         elif response == 'p':
             if self.question_history:
@@ -146,8 +289,8 @@ class WebStatementProcessor:
             "completed": False,
             "current": self.current_question_index + 1,
             "total": len(self.questions_needed),
-            "company_name": statement.get('company_name', 'Unknown'),
-            "similar_to": statement.get('similar_to', 'Unknown'),
+            "company_name": statement.company_name,
+            "similar_to": statement.similar_to or 'Unknown',
             "can_go_back": len(self.question_history) > 0
         }
     
@@ -158,20 +301,17 @@ class WebStatementProcessor:
         
         logger.info(f"[{self.session_id}] Starting create_results - JSON phase")
         
-        # Save JSON results first (fast operation)
+        # Save JSON results first (fast operation). A random suffix avoids the
+        # stat-per-attempt collision loop and its check-then-create race under
+        # concurrent sessions
         today = datetime.now().strftime("%b%d%Y").lower()
-        json_path = os.path.join(RESULT_FOLDER, f"{self.session_id}_{today}.json")
-        
-        counter = 1
-        while os.path.exists(json_path):
-            json_path = os.path.join(RESULT_FOLDER, f"{self.session_id}_{today}-{counter}.json")
-            counter += 1
-        
+        json_path = os.path.join(RESULT_FOLDER, f"{self.session_id}_{today}_{secrets.token_hex(3)}.json")
+
         logger.info(f"[{self.session_id}] JSON path determined: {json_path}")
         
         data = {
             "dnm_companies": self.processor.dnm_companies,
-            "extracted_statements": self.statements,
+            "extracted_statements": [stmt.to_dict() for stmt in self.statements],
             "total_statements_found": len(self.statements),
             "processing_timestamp": datetime.now().isoformat()
         }
@@ -179,71 +319,92 @@ class WebStatementProcessor:
         logger.info(f"[{self.session_id}] Creating results directory...")
         os.makedirs(RESULT_FOLDER, exist_ok=True)
         
+        # Compact output written as one blob: pretty-printing forces json into
+        # its slow path and roughly doubles the bytes, while chunk-at-a-time
+        # dumping causes many small write() calls
         logger.info(f"[{self.session_id}] Writing JSON file with {len(self.statements)} statements...")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(json_path, 'wb') as f:
+            f.write(payload)
         logger.info(f"[{self.session_id}] JSON file written successfully")
         
         # Initialize logging list for this session
         if not hasattr(self, '_processing_logs'):
-            self._processing_logs = []
+            self._processing_logs = deque(maxlen=1000)
+            self._log_total = 0
         
         def log_message(msg):
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] {msg}"
+            log_entry = f"[{_log_timestamp()}] {msg}"
             logger.info(f"[{self.session_id}] {msg}")
-            self._processing_logs.append(log_entry)
+            self._append_log(log_entry)
         
         # Start PDF creation in background thread (non-blocking)
-        import threading
         import time
-        
+
         def create_pdfs_async():
             try:
                 log_message("Background PDF thread started")
                 self._pdf_creation_status = 'creating'
                 self._pdf_start_time = time.time()
+                self.notify_state_change()
                 
                 log_message(f"Starting PDF creation with {len(self.statements)} statements")
                 
-                # Create split PDFs
-                log_message("Calling processor.create_split_pdfs()...")
-                split_results = self.processor.create_split_pdfs(self.statements)
+                # Create split PDFs in a worker process (CPU-bound page copying)
+                log_message("Calling split_statements_pdf() in worker process...")
+                split_results = _get_process_pool().submit(
+                    split_statements_pdf,
+                    str(self.processor.pdf_path),
+                    self.statements
+                ).result()
                 log_message(f"PDF creation returned: {split_results}")
                 
                 # Move PDFs to results directory
                 log_message("Moving PDFs to results directory...")
                 pdf_files = {}
+                moves = {}
+                # Join the result prefix once; os.path.join re-parses its
+                # arguments on every call
+                result_prefix = os.path.join(RESULT_FOLDER, self.session_id + "_")
                 for dest, pages in split_results.items():
-                    old_file = {
-                        "DNM": "DNM.pdf",
-                        "Foreign": "Foreign.pdf", 
-                        "Natio Single": "natioSingle.pdf",
-                        "Natio Multi": "natioMulti.pdf"
-                    }[dest]
-                    
-                    log_message(f"Processing {dest}: looking for {old_file} with {pages} pages")
-                    
+                    old_file = _PDF_NAMES[dest]
                     if os.path.exists(old_file):
-                        new_file = os.path.join(RESULT_FOLDER, f"{self.session_id}_{old_file}")
-                        log_message(f"Moving {old_file} to {new_file}")
-                        shutil.move(old_file, new_file)
-                        pdf_files[dest] = {"file": new_file, "pages": pages}
-                        log_message(f"Successfully moved {dest} PDF")
+                        moves[dest] = (old_file, result_prefix + old_file, pages)
                     else:
                         log_message(f"WARNING: {old_file} does not exist, skipping")
+
+                # The four destination files are independent and os.replace
+                # releases the GIL, so the move phase costs only the slowest
+                # single rename
+                if moves:
+                    with ThreadPoolExecutor(max_workers=len(moves)) as executor:
+                        futures = {
+                            executor.submit(os.replace, src, dst): dest
+                            for dest, (src, dst, _) in moves.items()
+                        }
+                        for future in as_completed(futures):
+                            dest = futures[future]
+                            future.result()
+                            _, new_file, pages = moves[dest]
+                            pdf_files[dest] = {"file": new_file, "pages": pages}
+                            log_message(f"Moved {dest} PDF ({pages} pages) to {new_file}")
                 
                 self._pdf_files = pdf_files
                 self._pdf_creation_status = 'completed'
                 self._pdf_end_time = time.time()
+                self.notify_state_change()
                 
                 elapsed = self._pdf_end_time - self._pdf_start_time
                 log_message(f"PDF creation completed successfully in {elapsed:.1f} seconds")
                 log_message(f"Created {len(pdf_files)} PDF files: {list(pdf_files.keys())}")
                 
             except Exception as e:
-                self._pdf_creation_status = 'error' 
+                self._pdf_creation_status = 'error'
                 self._pdf_error = str(e)
+                self.notify_state_change()
                 log_message(f"ERROR in PDF creation: {str(e)}")
                 logger.error(f"[{self.session_id}] PDF creation failed", exc_info=True)
         
@@ -274,40 +435,44 @@ class WebStatementProcessor:
         }
     
     def calculate_statistics(self) -> Dict[str, Any]:
-        """Calculate processing statistics"""
-        destinations = {}
+        """Calculate processing statistics in a single pass"""
+        # Counter tallies destinations in C; the remaining counts accumulate
+        # into local ints, which are cheaper than dict updates per iteration
+        destinations = Counter(stmt.destination for stmt in self.statements)
         manual_count = 0
         ask_count = 0
-        auto_dnm_reasons = {"exact": 0, "email": 0, "high_confidence": 0}
-        
+        exact_count = email_count = high_confidence_count = 0
+
         for stmt in self.statements:
-            dest = stmt.get('destination', 'Unknown')
-            destinations[dest] = destinations.get(dest, 0) + 1
-            
-            if stmt.get('manual_required', False):
+            if stmt.manual_required:
                 manual_count += 1
-            if stmt.get('ask_question', False):
+            if stmt.ask_question:
                 ask_count += 1
-            
+
             # Count auto-DNM reasons
-            if dest == "DNM":
-                if stmt.get('exact_match'):
-                    auto_dnm_reasons["exact"] += 1
-                elif "email" in stmt.get('rest_of_lines', '').lower():
-                    auto_dnm_reasons["email"] += 1
+            if stmt.destination == "DNM":
+                if stmt.exact_match:
+                    exact_count += 1
+                elif "email" in stmt.rest_of_lines.lower():
+                    email_count += 1
                 else:
-                    percentage = stmt.get('percentage', '')
+                    percentage = stmt.percentage
                     if percentage:
                         try:
-                            if float(percentage.replace('%', '')) >= 90.0:
-                                auto_dnm_reasons["high_confidence"] += 1
+                            # Slice off the trailing '%' instead of replace()
+                            if float(percentage[:-1] if percentage.endswith('%') else percentage) >= 90.0:
+                                high_confidence_count += 1
                         except ValueError:
                             pass
-        
+
         return {
             "total_statements": len(self.statements),
-            "destinations": destinations,
-            "dnm_breakdown": auto_dnm_reasons,
+            "destinations": dict(destinations),
+            "dnm_breakdown": {
+                "exact": exact_count,
+                "email": email_count,
+                "high_confidence": high_confidence_count
+            },
             "manual_processing": {
                 "manual_review_required": manual_count,
                 "interactive_questions": ask_count
@@ -322,7 +487,16 @@ def monthly_statements():
 def process_files():
     try:
         # Validate CSRF token is handled by Flask-WTF automatically
-        
+
+        # Reject oversized requests from the declared Content-Length before
+        # the body is read; touching request.files materializes the upload.
+        # MAX_CONTENT_LENGTH makes Werkzeug enforce the same cap for clients
+        # that lie about (or omit) the header.
+        content_length = request.content_length
+        if content_length and content_length > 50 * 1024 * 1024:
+            log_security_event('request_too_large', {'content_length': content_length})
+            return secure_error_response('Upload too large. Maximum total size is 50MB.', 413)
+
         # Check if files are present
         if 'pdf_file' not in request.files or 'excel_file' not in request.files:
             log_security_event('missing_files', {'missing': 'pdf_file or excel_file'})
@@ -331,8 +505,10 @@ def process_files():
         pdf_file = request.files['pdf_file']
         excel_file = request.files['excel_file']
         
-        # Check file sizes for optimal processing
-        pdf_size_mb = len(pdf_file.read()) / (1024 * 1024)
+        # Check file sizes for optimal processing - seek/tell measures the
+        # stream without reading the whole upload into memory
+        pdf_file.seek(0, os.SEEK_END)
+        pdf_size_mb = pdf_file.tell() / (1024 * 1024)
         pdf_file.seek(0)  # Reset file pointer
         
         if pdf_size_mb > 50:  # Vercel supports larger files
@@ -346,7 +522,6 @@ def process_files():
             return secure_error_response('; '.join(validation_result['errors']), 422)
         
         # Generate session ID with more entropy
-        import secrets
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         session_id = f"session_{timestamp}_{secrets.token_hex(4)}"
         
@@ -357,13 +532,9 @@ def process_files():
         pdf_path = os.path.join(UPLOAD_FOLDER, pdf_secure_name)
         excel_path = os.path.join(UPLOAD_FOLDER, excel_secure_name)
         
-        # Save files securely
-        pdf_file.save(pdf_path)
-        excel_file.save(excel_path)
-        
-        # Set restrictive permissions
-        os.chmod(pdf_path, 0o600)
-        os.chmod(excel_path, 0o600)
+        # Save files securely (permissions applied at create, no chmod window)
+        _save_upload(pdf_file, pdf_path)
+        _save_upload(excel_file, excel_path)
         
         # Create processor (quick operation)
         processor = WebStatementProcessor(pdf_path, excel_path, session_id)
@@ -428,17 +599,17 @@ def answer_question(session_id):
         # Start background PDF processing
         processor._processing_status = 'processing'
         processor._start_time = datetime.now()
-        
-        import threading
+        processor.notify_state_change()
+
         def background_pdf_creation():
             try:
                 processor._processing_status = 'creating_pdfs'
-                results = processor.create_results()
-                processor._results = results
+                processor.ensure_results()
                 processor._processing_status = 'completed'
             except Exception as e:
                 processor._processing_status = 'error'
                 processor._error_message = str(e)
+            processor.notify_state_change()
         
         thread = threading.Thread(target=background_pdf_creation)
         thread.daemon = True
@@ -470,13 +641,20 @@ def get_processing_status(session_id):
     processor = secure_session_manager.get_session(session_id)
     if not processor:
         return jsonify({'status': 'error', 'message': 'Session not found'}), 404
-    
+
+    # Long-poll: with ?seq=<n> the request parks until the state sequence
+    # advances past n (or 25s lapses), cutting the client's poll rate ~25x.
+    # Requests without seq keep the old immediate-response behavior.
+    last_seq = request.args.get('seq', type=int)
+    if last_seq is not None:
+        processor.wait_for_state_change(last_seq)
+
     status = getattr(processor, '_processing_status', 'unknown')
     pdf_status = getattr(processor, '_pdf_creation_status', 'unknown')
     start_time = getattr(processor, '_start_time', None)
     
-    response = {'status': status, 'pdf_status': pdf_status}
-    
+    response = {'status': status, 'pdf_status': pdf_status, 'seq': getattr(processor, '_state_seq', 0)}
+
     if start_time:
         elapsed = (datetime.now() - start_time).total_seconds()
         response['elapsed'] = int(elapsed)
@@ -515,12 +693,26 @@ def get_processing_logs(session_id):
     if not processor:
         return jsonify({'error': 'Session not found'}), 404
     
-    logs = getattr(processor, '_processing_logs', [])
-    return jsonify({
-        'logs': logs,
-        'count': len(logs),
-        'session_id': session_id
-    })
+    logs = getattr(processor, '_processing_logs', ())
+    total = getattr(processor, '_log_total', len(logs))
+
+    # ?since=<cursor from the previous response> returns only new entries,
+    # so polling clients stop re-downloading the whole log each tick.
+    # Entries evicted from the bounded buffer are silently skipped.
+    since = request.args.get('since', 0, type=int)
+    start = max(0, len(logs) - (total - since)) if since else 0
+    tail = list(islice(logs, start, None))
+
+    # Entries are already JSON-encoded bytes; splice them into the body
+    # directly instead of round-tripping through jsonify. session_id is
+    # safe to embed raw - it passed the strict format check above.
+    body = b''.join([
+        b'{"logs":[', b','.join(tail),
+        b'],"count":', str(len(tail)).encode('ascii'),
+        b',"next":', str(total).encode('ascii'),
+        b',"session_id":"', session_id.encode('ascii'), b'"}'
+    ])
+    return Response(body, mimetype='application/json')
 
 @monthly_statements_bp.route('/results/<session_id>')
 @require_valid_session
@@ -529,11 +721,8 @@ def results_page(session_id):
     if not processor:
         log_security_event('invalid_session_access', {'session_id': session_id, 'endpoint': 'results_page'})
         return render_template('monthly_statements/error.html', error='Session not found'), 404
-    if not hasattr(processor, '_results'):
-        processor._results = processor.create_results()
-    
-    # Get the results and update with async PDF files if ready
-    results = processor._results.copy()
+    # Get the results (built at most once) and update with async PDF files if ready
+    results = processor.ensure_results().copy()
     if hasattr(processor, '_pdf_files') and processor._pdf_files:
         results['pdf_files'] = processor._pdf_files
         results['pdf_status'] = 'completed'
@@ -562,30 +751,18 @@ def download_results(session_id):
     if not pdf_files:
         return jsonify({'error': 'No PDF files available for download'}), 404
     
-    # Create temporary zip file
-    temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
-    try:
-        with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            files_added = 0
-            for dest, file_info in pdf_files.items():
-                file_path = file_info["file"]
-                if os.path.exists(file_path):
-                    # Add with meaningful name
-                    zip_file.write(file_path, f"{dest}.pdf")
-                    files_added += 1
-            
-            if files_added == 0:
-                return jsonify({'error': 'PDF files not found on disk'}), 404
-        
-        temp_zip.close()
-        
-        return send_from_directory(
-            os.path.dirname(temp_zip.name),
-            os.path.basename(temp_zip.name),
-            as_attachment=True,
-            download_name=f"monthly_statements_{session_id}.zip"
-        )
-    except Exception as e:
-        if temp_zip:
-            temp_zip.close()
-        return jsonify({'error': f'Failed to create ZIP file: {str(e)}'}), 500
\ No newline at end of file
+    # Stream the zip directly into the response - no temp archive on disk
+    entries = [
+        (f"{dest}.pdf", file_info["file"])
+        for dest, file_info in pdf_files.items()
+        if os.path.exists(file_info["file"])
+    ]
+
+    if not entries:
+        return jsonify({'error': 'PDF files not found on disk'}), 404
+
+    return Response(
+        _stream_zip(entries),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename=monthly_statements_{session_id}.zip'}
+    )
\ No newline at end of file
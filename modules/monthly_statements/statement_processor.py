@@ -17,11 +17,18 @@ import os
 import glob
 import sys
 import gc
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from difflib import get_close_matches, SequenceMatcher
 from typing import Dict, List, Tuple, Optional, Set, Any
 
+# orjson's C encoder is 5-10x faster than stdlib json for large dumps
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Try PyMuPDF first (better text extraction), fall back to pypdf
 try:
     import fitz  # PyMuPDF
@@ -36,6 +43,49 @@ except ImportError:
         raise ImportError("Neither PyMuPDF nor pypdf is available. Please install one of them.")
 
 
+@dataclass(slots=True)
+class Statement:
+    """
+    Lightweight statement record with slot-based storage.
+
+    Attribute access on slots compiles to a C-level load instead of a hash
+    probe per field, which matters in the statistics and question hot loops.
+    """
+    company_name: str = "Unknown"
+    exact_match: Optional[str] = None
+    similar_to: Optional[str] = None
+    percentage: Optional[str] = None
+    manual_required: bool = False
+    ask_question: bool = False
+    rest_of_lines: str = ""
+    location: str = "Foreign"
+    paging: str = ""
+    number_of_pages: str = "1"
+    page_number_in_uploaded_pdf: str = ""
+    destination: str = "Unknown"
+    user_answered: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the JSON-serializable dict shape used in results files."""
+        result = {
+            "company_name": self.company_name,
+            "exact_match": self.exact_match,
+            "similar_to": self.similar_to,
+            "percentage": self.percentage,
+            "manual_required": self.manual_required,
+            "ask_question": self.ask_question,
+            "rest_of_lines": self.rest_of_lines,
+            "location": self.location,
+            "paging": self.paging,
+            "number_of_pages": self.number_of_pages,
+            "page_number_in_uploaded_pdf": self.page_number_in_uploaded_pdf,
+            "destination": self.destination
+        }
+        if self.user_answered is not None:
+            result["user_answered"] = self.user_answered
+        return result
+
+
 class StatementProcessor:
     """
     Professional statement processor with O(n) complexity optimizations.
@@ -259,7 +309,7 @@ class StatementProcessor:
             return "Foreign"
         return "Natio Single" if pages == 1 else "Natio Multi"
     
-    def _extract_statement_data(self, text: str, page_num: int) -> Optional[Dict[str, Any]]:
+    def _extract_statement_data(self, text: str, page_num: int) -> Optional[Statement]:
         """Extract statement data from page text - O(1) per page operation."""
         # Parse page information
         page_match = self.patterns['page'].search(text)
@@ -315,22 +365,22 @@ class StatementProcessor:
             if manual_required and similarity_percent:
                 ask_question = float(similarity_percent.replace('%', '')) < 90.0
         
-        return {
-            "company_name": company_name,
-            "exact_match": exact_match,
-            "similar_to": similar_match,
-            "percentage": similarity_percent,
-            "manual_required": manual_required,
-            "ask_question": ask_question,
-            "rest_of_lines": rest_text,
-            "location": location,
-            "paging": f"page {current_page} of {total_pages}",
-            "number_of_pages": str(total_pages),
-            "page_number_in_uploaded_pdf": page_range,
-            "destination": self._determine_destination(exact_match, rest_text, location, total_pages, similarity_percent)
-        }
+        return Statement(
+            company_name=company_name,
+            exact_match=exact_match,
+            similar_to=similar_match,
+            percentage=similarity_percent,
+            manual_required=manual_required,
+            ask_question=ask_question,
+            rest_of_lines=rest_text,
+            location=location,
+            paging=f"page {current_page} of {total_pages}",
+            number_of_pages=str(total_pages),
+            page_number_in_uploaded_pdf=page_range,
+            destination=self._determine_destination(exact_match, rest_text, location, total_pages, similarity_percent)
+        )
     
-    def extract_statements(self) -> List[Dict[str, Any]]:
+    def extract_statements(self) -> List[Statement]:
         """Extract all statements from PDF - O(n) where n = number of pages."""
         try:
             statements = []
@@ -356,12 +406,12 @@ class StatementProcessor:
                         
                     if statement_data:
                         statements.append(statement_data)
-                        print(f"✓ Extracted: {statement_data['company_name']}")
-                        
+                        print(f"✓ Extracted: {statement_data.company_name}")
+
                         # Mark pages as processed to avoid reprocessing
-                        total_pages_stmt = int(statement_data["number_of_pages"])
+                        total_pages_stmt = int(statement_data.number_of_pages)
                         if total_pages_stmt > 1:
-                            page_range = statement_data["page_number_in_uploaded_pdf"].split("-")
+                            page_range = statement_data.page_number_in_uploaded_pdf.split("-")
                             self._processed_pages.update(range(int(page_range[0]), int(page_range[-1]) + 1))
                         else:
                             self._processed_pages.add(page_num)
@@ -389,12 +439,12 @@ class StatementProcessor:
                     
                     if statement_data:
                         statements.append(statement_data)
-                        print(f"✓ Extracted: {statement_data['company_name']}")
-                        
+                        print(f"✓ Extracted: {statement_data.company_name}")
+
                         # Mark pages as processed to avoid reprocessing
-                        total_pages_stmt = int(statement_data["number_of_pages"])
+                        total_pages_stmt = int(statement_data.number_of_pages)
                         if total_pages_stmt > 1:
-                            page_range = statement_data["page_number_in_uploaded_pdf"].split("-")
+                            page_range = statement_data.page_number_in_uploaded_pdf.split("-")
                             self._processed_pages.update(range(int(page_range[0]), int(page_range[-1]) + 1))
                         else:
                             self._processed_pages.add(page_num)
@@ -404,9 +454,9 @@ class StatementProcessor:
         except Exception as e:
             raise RuntimeError(f"Failed to extract statements: {e}")
     
-    def process_interactive_questions(self, statements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def process_interactive_questions(self, statements: List[Statement]) -> List[Statement]:
         """Process interactive questions for companies requiring manual review."""
-        questions_needed = [stmt for stmt in statements if stmt.get('ask_question', False)]
+        questions_needed = [stmt for stmt in statements if stmt.ask_question]
         
         if not questions_needed:
             print("No manual questions required.")
@@ -420,13 +470,13 @@ class StatementProcessor:
         
         while i < len(questions_needed):
             if skip_all:
-                for j in range(i, len(questions_needed)):
-                    questions_needed[j]['user_answered'] = 'skip'
+                for stmt in questions_needed[i:]:
+                    stmt.user_answered = 'skip'
                 break
-            
+
             statement = questions_needed[i]
-            company_name = statement.get('company_name', 'Unknown')
-            similar_to = statement.get('similar_to', 'Unknown')
+            company_name = statement.company_name
+            similar_to = statement.similar_to or 'Unknown'
             
             print(f"\nQuestion {i + 1} of {len(questions_needed)}:")
             print(f"Company '{company_name}' is similar to '{similar_to}' in DNM list")
@@ -441,56 +491,53 @@ class StatementProcessor:
                         history.append({
                             'index': i,
                             'statement_state': {
-                                'destination': statement.get('destination'),
-                                'user_answered': statement.get('user_answered')
+                                'destination': statement.destination,
+                                'user_answered': statement.user_answered
                             }
                         })
-                        
-                        statement['destination'] = 'DNM'
-                        statement['user_answered'] = 'yes'
+
+                        statement.destination = 'DNM'
+                        statement.user_answered = 'yes'
                         print(f"✓ Marked '{company_name}' as DNM")
                         i += 1  # Move to next question
                         break
-                        
+
                     elif response == 'n':
                         # Save current state to history before making changes
                         history.append({
                             'index': i,
                             'statement_state': {
-                                'destination': statement.get('destination'),
-                                'user_answered': statement.get('user_answered')
+                                'destination': statement.destination,
+                                'user_answered': statement.user_answered
                             }
                         })
-                        
-                        statement['user_answered'] = 'no'
-                        print(f"✓ Kept '{company_name}' as {statement['destination']}")
+
+                        statement.user_answered = 'no'
+                        print(f"✓ Kept '{company_name}' as {statement.destination}")
                         i += 1  # Move to next question
                         break
-                        
+
                     elif response == 's':
                         skip_all = True
-                        statement['user_answered'] = 'skip'
+                        statement.user_answered = 'skip'
                         print("✓ Skipping remaining questions")
                         break
-                        
+
                     elif response == 'p':
                         if not history:
                             print("No previous questions to go back to")
                             continue
-                        
+
                         # Restore previous state
                         previous = history.pop()
                         prev_index = previous['index']
                         prev_state = previous['statement_state']
-                        
+
                         # Restore the previous statement's state
                         prev_statement = questions_needed[prev_index]
-                        prev_statement['destination'] = prev_state['destination']
-                        if 'user_answered' in prev_state and prev_state['user_answered'] is not None:
-                            prev_statement['user_answered'] = prev_state['user_answered']
-                        elif 'user_answered' in prev_statement:
-                            del prev_statement['user_answered']
-                        
+                        prev_statement.destination = prev_state['destination']
+                        prev_statement.user_answered = prev_state['user_answered']
+
                         i = prev_index  # Go back to previous question
                         print(f"↩ Going back to question {i + 1}")
                         break
@@ -504,117 +551,11 @@ class StatementProcessor:
         
         return statements
     
-    def create_split_pdfs(self, statements: List[Dict[str, Any]]) -> Dict[str, int]:
+    def create_split_pdfs(self, statements: List[Statement]) -> Dict[str, int]:
         """Split PDF into destination-based files with detailed logging."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        logger.info(f"PDF Creation: Starting with {len(statements)} statements")
-        
-        # Group statements by destination - O(n)
-        destinations = {"DNM": [], "Foreign": [], "Natio Single": [], "Natio Multi": []}
-        
-        logger.info("PDF Creation: Grouping statements by destination...")
-        for statement in statements:
-            dest = statement.get('destination', '').strip()
-            if dest in destinations:
-                destinations[dest].append(statement)
-        
-        dest_counts = {dest: len(stmts) for dest, stmts in destinations.items() if stmts}
-        logger.info(f"PDF Creation: Destination counts: {dest_counts}")
-        
-        # Create output PDFs
-        output_files = {
-            "DNM": "DNM.pdf",
-            "Foreign": "Foreign.pdf", 
-            "Natio Single": "natioSingle.pdf",
-            "Natio Multi": "natioMulti.pdf"
-        }
-        
-        results = {}
-        
-        try:
-            logger.info(f"PDF Creation: Using {PDF_LIBRARY} library")
-            
-            # Process PDFs with memory management for Render free tier
-            if PDF_LIBRARY == 'pymupdf':
-                # Use PyMuPDF (original method)
-                logger.info("PDF Creation: Importing PyPDF2 for writing...")
-                from PyPDF2 import PdfReader, PdfWriter  # For writing
-                logger.info(f"PDF Creation: Opening PDF file: {self.pdf_path}")
-                reader = PdfReader(str(self.pdf_path))
-                total_pages = len(reader.pages)
-                logger.info(f"PDF Creation: Source PDF has {total_pages} pages")
-            else:
-                # Use pypdf
-                logger.info("PDF Creation: Using pypdf for reading...")
-                reader = PdfReader(str(self.pdf_path))
-                total_pages = len(reader.pages)
-                logger.info(f"PDF Creation: Source PDF has {total_pages} pages")
-            
-            # Process each destination separately to minimize memory usage
-            for dest, statements_list in destinations.items():
-                if not statements_list:
-                    logger.info(f"PDF Creation: Skipping {dest} - no statements")
-                    continue
-                
-                logger.info(f"PDF Creation: Processing {dest} with {len(statements_list)} statements...")
-                
-                if PDF_LIBRARY == 'pymupdf':
-                    from PyPDF2 import PdfWriter
-                    writer = PdfWriter()
-                else:
-                    from pypdf import PdfWriter
-                    writer = PdfWriter()
-                
-                logger.info(f"PDF Creation: Created writer for {dest}")
-                pages_added = 0
-                
-                for i, statement in enumerate(statements_list):
-                    page_range = statement.get('page_number_in_uploaded_pdf', '')
-                    logger.info(f"PDF Creation: {dest} statement {i+1}/{len(statements_list)}: page range '{page_range}'")
-                    
-                    for page_str in page_range.split('-'):
-                        try:
-                            page_num = int(page_str.strip()) - 1  # Convert to 0-based index
-                            if 0 <= page_num < total_pages:
-                                logger.info(f"PDF Creation: Adding page {page_num+1} to {dest}")
-                                writer.add_page(reader.pages[page_num])
-                                pages_added += 1
-                            else:
-                                logger.warning(f"PDF Creation: Page {page_num+1} out of range (1-{total_pages})")
-                        except (ValueError, IndexError) as e:
-                            logger.warning(f"PDF Creation: Invalid page number '{page_str}': {e}")
-                            continue
-                
-                if pages_added > 0:
-                    output_path = output_files[dest]
-                    logger.info(f"PDF Creation: Writing {dest} PDF with {pages_added} pages to {output_path}")
-                    with open(output_path, 'wb') as f:
-                        writer.write(f)
-                    results[dest] = pages_added
-                    logger.info(f"PDF Creation: ✓ Successfully created {output_path} with {pages_added} pages")
-                else:
-                    logger.warning(f"PDF Creation: No pages added for {dest}, skipping file creation")
-                
-                # Clean up memory after each destination
-                logger.info(f"PDF Creation: Cleaning up memory for {dest}")
-                del writer
-                gc.collect()
-            
-            # Final cleanup
-            logger.info("PDF Creation: Final cleanup...")
-            del reader
-            gc.collect()
-            
-            logger.info(f"PDF Creation: Completed successfully, created {len(results)} files: {list(results.keys())}")
-            return results
-            
-        except Exception as e:
-            logger.error(f"PDF Creation: FAILED with error: {e}", exc_info=True)
-            raise RuntimeError(f"Failed to create split PDFs: {e}")
-    
-    def save_results(self, statements: List[Dict[str, Any]], output_path: Optional[str] = None) -> str:
+        return split_statements_pdf(str(self.pdf_path), statements)
+
+    def save_results(self, statements: List[Statement], output_path: Optional[str] = None) -> str:
         """Save processing results to JSON file."""
         if not output_path:
             today = datetime.now().strftime("%b%d%Y").lower()
@@ -627,15 +568,19 @@ class StatementProcessor:
         
         data = {
             "dnm_companies": self.dnm_companies,
-            "extracted_statements": statements,
+            "extracted_statements": [stmt.to_dict() for stmt in statements],
             "total_statements_found": len(statements),
             "processing_timestamp": datetime.now().isoformat()
         }
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
+            if orjson is not None:
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
             print(f"✓ Results saved to {output_path}")
             return output_path
             
@@ -692,8 +637,8 @@ class StatementProcessor:
                 print("🎯 EXTRACTION COMPLETED FOR COMPARISON")
                 print("=" * 60)
                 
-                manual_count = sum(1 for s in statements if s.get('manual_required', False))
-                ask_count = sum(1 for s in statements if s.get('ask_question', False))
+                manual_count = sum(1 for s in statements if s.manual_required)
+                ask_count = sum(1 for s in statements if s.ask_question)
                 
                 print(f"Total statements processed: {len(statements)}")
                 print(f"Manual review required: {manual_count}")
@@ -709,6 +654,122 @@ class StatementProcessor:
             return False
 
 
+def split_statements_pdf(pdf_path: str, statements: List[Statement]) -> Dict[str, int]:
+    """Split a statements PDF into destination-based files with detailed logging.
+
+    Module-level so it can run in a worker process with picklable arguments.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    logger.info(f"PDF Creation: Starting with {len(statements)} statements")
+    
+    # Group statements by destination - O(n)
+    destinations = {"DNM": [], "Foreign": [], "Natio Single": [], "Natio Multi": []}
+    
+    logger.info("PDF Creation: Grouping statements by destination...")
+    for statement in statements:
+        dest = statement.destination.strip()
+        if dest in destinations:
+            destinations[dest].append(statement)
+    
+    dest_counts = {dest: len(stmts) for dest, stmts in destinations.items() if stmts}
+    logger.info(f"PDF Creation: Destination counts: {dest_counts}")
+    
+    # Create output PDFs
+    output_files = {
+        "DNM": "DNM.pdf",
+        "Foreign": "Foreign.pdf", 
+        "Natio Single": "natioSingle.pdf",
+        "Natio Multi": "natioMulti.pdf"
+    }
+    
+    results = {}
+    
+    try:
+        logger.info(f"PDF Creation: Using {PDF_LIBRARY} library")
+        
+        # Process PDFs with memory management for Render free tier
+        if PDF_LIBRARY == 'pymupdf':
+            # Use PyMuPDF (original method)
+            logger.info("PDF Creation: Importing PyPDF2 for writing...")
+            from PyPDF2 import PdfReader, PdfWriter  # For writing
+            logger.info(f"PDF Creation: Opening PDF file: {pdf_path}")
+            reader = PdfReader(str(pdf_path))
+            total_pages = len(reader.pages)
+            logger.info(f"PDF Creation: Source PDF has {total_pages} pages")
+        else:
+            # Use pypdf
+            logger.info("PDF Creation: Using pypdf for reading...")
+            reader = PdfReader(str(pdf_path))
+            total_pages = len(reader.pages)
+            logger.info(f"PDF Creation: Source PDF has {total_pages} pages")
+        
+        # Process each destination separately to minimize memory usage
+        for dest, statements_list in destinations.items():
+            if not statements_list:
+                logger.info(f"PDF Creation: Skipping {dest} - no statements")
+                continue
+            
+            logger.info(f"PDF Creation: Processing {dest} with {len(statements_list)} statements...")
+            
+            if PDF_LIBRARY == 'pymupdf':
+                from PyPDF2 import PdfWriter
+                writer = PdfWriter()
+            else:
+                from pypdf import PdfWriter
+                writer = PdfWriter()
+            
+            logger.info(f"PDF Creation: Created writer for {dest}")
+            pages_added = 0
+            
+            for i, statement in enumerate(statements_list):
+                page_range = statement.page_number_in_uploaded_pdf
+                # Per-statement/per-page details are debug-only: at INFO the
+                # string formatting alone dominated large jobs
+                logger.debug("PDF Creation: %s statement %d/%d: page range '%s'", dest, i + 1, len(statements_list), page_range)
+
+                for page_str in page_range.split('-'):
+                    try:
+                        page_num = int(page_str.strip()) - 1  # Convert to 0-based index
+                        if 0 <= page_num < total_pages:
+                            logger.debug("PDF Creation: Adding page %d to %s", page_num + 1, dest)
+                            writer.add_page(reader.pages[page_num])
+                            pages_added += 1
+                        else:
+                            logger.warning(f"PDF Creation: Page {page_num+1} out of range (1-{total_pages})")
+                    except (ValueError, IndexError) as e:
+                        logger.warning(f"PDF Creation: Invalid page number '{page_str}': {e}")
+                        continue
+            
+            if pages_added > 0:
+                output_path = output_files[dest]
+                logger.info(f"PDF Creation: Writing {dest} PDF with {pages_added} pages to {output_path}")
+                with open(output_path, 'wb') as f:
+                    writer.write(f)
+                results[dest] = pages_added
+                logger.info(f"PDF Creation: ✓ Successfully created {output_path} with {pages_added} pages")
+            else:
+                logger.warning(f"PDF Creation: No pages added for {dest}, skipping file creation")
+            
+            # Clean up memory after each destination
+            logger.info(f"PDF Creation: Cleaning up memory for {dest}")
+            del writer
+            gc.collect()
+        
+        # Final cleanup
+        logger.info("PDF Creation: Final cleanup...")
+        del reader
+        gc.collect()
+        
+        logger.info(f"PDF Creation: Completed successfully, created {len(results)} files: {list(results.keys())}")
+        return results
+        
+    except Exception as e:
+        logger.error(f"PDF Creation: FAILED with error: {e}", exc_info=True)
+        raise RuntimeError(f"Failed to create split PDFs: {e}")
+
+
 def find_files_in_directory() -> Tuple[Optional[str], Optional[str]]:
     """Find PDF and Excel files in current directory."""
     pdf_files = list(Path('.').glob('*.pdf'))